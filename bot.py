@@ -1,192 +1,300 @@
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Awaitable, Deque, Dict, List, Optional, Union
+import asyncio
+import atexit
+import collections
+import functools
+import hashlib
+import hmac
+import json
+import math
 import traceback
 import time
+from types import MappingProxyType
+from urllib.parse import quote
 
-from binance.client import Client
-from binance.exceptions import BinanceAPIException
+import aiohttp
+import orjson
+from binance import AsyncClient
+from binance.exceptions import BinanceAPIException, BinanceRequestException
 from loguru import logger
+from yarl import URL
 
-from config import TESTNET_URL, LOG_FILE
+from config import TESTNET_URL, LOG_FILE, KEEPALIVE_INTERVAL_S
 
 
-logger.add(LOG_FILE, rotation="500 KB")
+_INFO_LEVEL_NO = 20
+
+# Maximum orders accepted by POST /fapi/v1/batchOrders
+_BATCH_ORDER_LIMIT = 5
+
+# Binance new-order rate limit honoured by burst TWAPs
+_MAX_ORDERS_PER_S = 10
+
+# Quantities are handled in integer units of 1e-8
+_QTY_SCALE = 10 ** 8
+
+# Constant order fields; per-call fields are merged in with `|`
+_MARKET_BASE = MappingProxyType({"type": "MARKET"})
+_LIMIT_BASE = MappingProxyType({"type": "LIMIT", "timeInForce": "GTC"})
+_STOP_BASE = MappingProxyType({"type": "STOP", "timeInForce": "GTC"})
+
+
+_LOG_CONFIGURED = False
+
+
+def configure_logging():
+    """Add the log file sink; safe to call more than once."""
+    global _LOG_CONFIGURED
+    if _LOG_CONFIGURED:
+        return
+    # Records are queued and written by loguru's worker thread, off the order path
+    logger.add(LOG_FILE, rotation="500 KB", enqueue=True, buffering=8192, compression=None)
+    atexit.register(logger.complete)
+    _LOG_CONFIGURED = True
+
+
+def _info_enabled() -> bool:
+    # Cheaper than formatting a record that no sink would emit
+    return logger._core.min_level <= _INFO_LEVEL_NO
+
+
+def _format_units(units: int) -> str:
+    # Plain decimal; str(float) would switch to scientific notation that Binance rejects
+    return f"{units // _QTY_SCALE}.{units % _QTY_SCALE:08d}"
+
+
+def _split_batches(units: List[int]) -> List[List[int]]:
+    return [units[i:i + _BATCH_ORDER_LIMIT] for i in range(0, len(units), _BATCH_ORDER_LIMIT)]
+
+
+@functools.lru_cache(maxsize=256)
+def _error_result(msg: str) -> Dict[str, Any]:
+    # Rejection storms (e.g. HTTP 429) repeat the same few messages; share one dict per message.
+    # The returned dict is shared, so callers must treat it as read-only.
+    return {"error": msg}
+
+
+class _PooledAsyncClient(AsyncClient):
+    """AsyncClient whose session keeps TLS connections open between orders and decodes responses with orjson."""
+
+    def _init_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit=50, keepalive_timeout=90)
+        headers = self._get_headers()
+        headers.update({"Connection": "keep-alive", "Keep-Alive": "timeout=90, max=1000"})
+        return aiohttp.ClientSession(connector=connector, headers=headers)
+
+    async def _handle_response(self, response: aiohttp.ClientResponse):
+        if not str(response.status).startswith('2'):
+            raise BinanceAPIException(response, response.status, await response.text())
+        try:
+            return orjson.loads(await response.read())
+        except ValueError:
+            raise BinanceRequestException(f"Invalid Response: {await response.text()}")
+
+
+class _OrderRateLimiter:
+    """Sliding one-second window admitting at most `rate` orders."""
+
+    def __init__(self, rate: int):
+        self.rate = rate
+        self._sent: Deque[float] = collections.deque()  # admission time per order
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, n: int = 1):
+        if n > self.rate:
+            raise ValueError("cannot acquire more than {} orders at once".format(self.rate))
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0] >= 1.0:
+                    self._sent.popleft()
+                excess = len(self._sent) + n - self.rate
+                if excess <= 0:
+                    self._sent.extend([now] * n)
+                    return
+                # Wait until enough of the oldest orders leave the window
+                await asyncio.sleep(self._sent[excess - 1] + 1.0 - now)
 
 
 class BasicBot:
     """Simplified Binance Futures (USDT-M) bot wrapper.
 
     Provides market, limit, stop-limit, and TWAP helpers with logging.
+    Order helpers are coroutines; build instances with ``await BasicBot.create(...)``.
     """
 
-    def __init__(self, api_key: str, api_secret: str, testnet: bool = True):
-        self.client = Client(api_key, api_secret)
+    def __init__(self, client: AsyncClient, testnet: bool = True):
+        self.client = client
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self._order_limiter = _OrderRateLimiter(_MAX_ORDERS_PER_S)
 
         if testnet:
-            # Try to set common attributes that affect endpoints in some python-binance versions
-            try:
-                self.client.FUTURES_URL = TESTNET_URL
-            except Exception:
-                pass
-            try:
-                self.client.API_URL = TESTNET_URL
-            except Exception:
-                pass
+            # Set common attributes that affect endpoints in some python-binance versions
+            for attr in ("FUTURES_URL", "API_URL"):
+                if hasattr(self.client, attr):
+                    setattr(self.client, attr, TESTNET_URL)
+
+        # Constant parts of the signed TWAP request, reused for every batch
+        self._hmac_prototype = hmac.new(self.client.API_SECRET.encode(), digestmod=hashlib.sha256)
+        self._batch_orders_url = self.client._create_futures_api_uri("batchOrders")
+        self._futures_create_order = self.client.futures_create_order
 
         logger.info("Initialized BasicBot (testnet={})", testnet)
 
+    @classmethod
+    async def create(cls, api_key: str, api_secret: str, testnet: bool = True) -> "BasicBot":
+        client = await _PooledAsyncClient.create(api_key, api_secret, testnet=testnet)
+        bot = cls(client, testnet=testnet)
+        await bot._warm_up()
+        bot._keepalive_task = asyncio.create_task(bot._keepalive())
+        return bot
+
+    async def close(self):
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        await self.client.close_connection()
+
+    async def _warm_up(self):
+        # Open the futures TLS connection and sync the clock so the first order hits a hot socket
+        try:
+            await self.client.futures_ping()
+            res = await self.client.futures_time()
+            self.client.timestamp_offset = res["serverTime"] - int(time.time() * 1000)
+        except Exception as e:
+            logger.warning("Futures warm-up failed: {}", str(e))
+
+    async def _keepalive(self):
+        # Ping periodically so the pooled socket stays hot between TWAP slices
+        while True:
+            await asyncio.sleep(KEEPALIVE_INTERVAL_S)
+            try:
+                await self.client.futures_ping()
+            except Exception as e:
+                logger.warning("Keep-alive ping failed: {}", str(e))
+
     def _log_order_call(self, method: str, params: Dict[str, Any]):
         logger.info("Request -> {}: {}", method, params)
 
-    def _log_response(self, method: str, resp: Any):
-        logger.info("Response <- {}: {}", method, resp)
+    def _log_response(self, method: str, resp: Any, elapsed_us: int):
+        if not _info_enabled():
+            return
+        logger.info("Response <- {}: {}", method, {"elapsed_us": elapsed_us, "result": resp})
 
-    def _safe_execute(self, fn, *args, **kwargs):
+    async def _safe_execute(self, fn, *args, **kwargs):
         method = fn.__name__ if hasattr(fn, "__name__") else str(fn)
         try:
-            self._log_order_call(method, {**kwargs})
-            start = time.time()
-            resp = fn(*args, **kwargs)
-            elapsed = time.time() - start
-            self._log_response(method, {"elapsed_s": round(elapsed, 4), "result": resp})
+            if _info_enabled():
+                self._log_order_call(method, {**kwargs})
+            start = time.perf_counter_ns()
+            resp = await fn(*args, **kwargs)
+            elapsed_us = (time.perf_counter_ns() - start) // 1000
+            self._log_response(method, resp, elapsed_us)
             return resp
         except BinanceAPIException as e:
-            logger.error("BinanceAPIException in {}: {}", method, getattr(e, 'message', str(e)))
-            return {"error": getattr(e, 'message', str(e))}
+            msg = e.message if hasattr(e, 'message') else str(e)
+            logger.error("BinanceAPIException in {}: {}", method, msg)
+            return _error_result(msg)
         except Exception as e:
             logger.error("Unexpected error in {}: {}", method, str(e))
-            logger.debug("Traceback:\n{}", traceback.format_exc())
+            logger.opt(lazy=True).debug("Traceback:\n{}", traceback.format_exc)
             return {"error": str(e)}
 
     # Market
-    def place_market_order(self, symbol: str, side: str, quantity: float) -> Dict[str, Any]:
-        params = dict(symbol=symbol, side=side, type="MARKET", quantity=quantity)
-        return self._safe_execute(self.client.futures_create_order, **params)
+    async def place_market_order(self, symbol: str, side: str, quantity: float) -> Dict[str, Any]:
+        params = _MARKET_BASE | {"symbol": symbol, "side": side, "quantity": quantity}
+        return await self._safe_execute(self._futures_create_order, **params)
 
     # Limit
-    def place_limit_order(self, symbol: str, side: str, quantity: float, price: float) -> Dict[str, Any]:
-        params = dict(symbol=symbol, side=side, type="LIMIT", timeInForce="GTC", price=price, quantity=quantity)
-        return self._safe_execute(self.client.futures_create_order, **params)
+    async def place_limit_order(self, symbol: str, side: str, quantity: float, price: float) -> Dict[str, Any]:
+        params = _LIMIT_BASE | {"symbol": symbol, "side": side, "price": price, "quantity": quantity}
+        return await self._safe_execute(self._futures_create_order, **params)
 
     # Stop-Limit
-    def place_stop_limit(self, symbol: str, side: str, quantity: float, price: float, stop_price: float) -> Dict[str, Any]:
-        params = dict(symbol=symbol, side=side, type="STOP", timeInForce="GTC", price=price, stopPrice=stop_price, quantity=quantity)
-        return self._safe_execute(self.client.futures_create_order, **params)
-
-    # TWAP (simple): split into N market orders spaced by `interval_s`
-    def place_twap(self, symbol: str, side: str, total_quantity: float, slices: int = 5, interval_s: int = 1) -> List[Dict[str, Any]]:
+    async def place_stop_limit(self, symbol: str, side: str, quantity: float, price: float, stop_price: float) -> Dict[str, Any]:
+        params = _STOP_BASE | {"symbol": symbol, "side": side, "price": price, "stopPrice": stop_price, "quantity": quantity}
+        return await self._safe_execute(self._futures_create_order, **params)
+
+    async def _fast_place_batch_order(self, batchOrders: str) -> List[Dict[str, Any]]:
+        """POST /fapi/v1/batchOrders signed from the cached HMAC state, bypassing the generic request builder."""
+        ts = int(time.time() * 1000 + self.client.timestamp_offset)
+        query = f"batchOrders={quote(batchOrders, safe='')}&timestamp={ts}&recvWindow=5000"
+        sig = self._hmac_prototype.copy()
+        sig.update(query.encode())
+        # encoded=True keeps yarl from re-quoting the string the signature was computed over
+        url = URL(f"{self._batch_orders_url}?{query}&signature={sig.hexdigest()}", encoded=True)
+        async with self.client.session.post(url) as response:
+            return await self.client._handle_response(response)
+
+    # Batch of market orders in a single signed request
+    async def _place_market_batch(self, symbol: str, side: str, units: List[int]) -> List[Dict[str, Any]]:
+        orders = [_MARKET_BASE | {"symbol": symbol, "side": side, "quantity": _format_units(u)} for u in units]
+        await self._order_limiter.acquire(len(orders))
+        res = await self._safe_execute(self._fast_place_batch_order, batchOrders=json.dumps(orders, separators=(",", ":")))
+        if isinstance(res, list):
+            return res
+        # The whole request failed: report the error against every slice it carried
+        return [res] * len(units)
+
+    # TWAP (simple): split into N market orders, submitted in batches spaced by `interval_s`
+    def place_twap(
+        self, symbol: str, side: str, total_quantity: float, slices: int = 5, interval_s: int = 1, collect: bool = False
+    ) -> Union[AsyncIterator[Dict[str, Any]], Awaitable[List[Dict[str, Any]]]]:
+        """Stream per-slice results as an async iterator, or await them all as a list with ``collect=True``."""
         if slices <= 0:
             raise ValueError("slices must be >= 1")
-        results: List[Dict[str, Any]] = []
-        base = float(total_quantity) / slices
-        for i in range(slices):
-            # For last slice, ensure rounding doesn't drop quantity
-            qty = round(base, 8) if i < slices - 1 else round(total_quantity - base * (slices - 1), 8)
-            logger.info("TWAP slice {}/{} placing market order qty={}", i + 1, slices, qty)
-            res = self.place_market_order(symbol, side, qty)
-            results.append(res)
-            if i < slices - 1:
-                time.sleep(interval_s)
-        return results
-from binance.client import Client
-from binance.exceptions import BinanceAPIException
-from loguru import logger
-from config import TESTNET_URL, LOG_FILE
-
-logger.add(LOG_FILE, rotation="500 KB")
-
-class BasicBot:
-    def __init__(self, api_key, api_secret, testnet=True):
-        self.client = Client(api_key, api_secret)
-        self.client.FUTURES_URL = TESTNET_URL  # ensure testnet usage
-
-        logger.info("Initialized bot with testnet mode: {}", testnet)
-
-    # ---------------------- MARKET ORDER ---------------------- #
-    def place_market_order(self, symbol, side, quantity):
-        try:
+        if not math.isfinite(total_quantity):
+            raise ValueError("total_quantity must be a finite number")
+        # Split in integer 1e-8 units so the slices sum exactly to total_quantity
+        q_units = int(round(total_quantity * _QTY_SCALE))
+        if q_units <= 0:
+            raise ValueError("total_quantity must be at least 0.00000001")
+        slice_units, remainder = divmod(q_units, slices)
+        units = [slice_units + (1 if i < remainder else 0) for i in range(slices)]
+        if slice_units == 0:
+            # More slices than 1e-8 units: drop the empty slices rather than send zero-quantity orders
+            units = units[:remainder]
+            logger.warning("TWAP reduced to {} slices; quantity {} can't fill {}", len(units), total_quantity, slices)
+        if collect:
+            return self._twap_collect(symbol, side, units, interval_s)
+        return self._twap_stream(symbol, side, units, interval_s)
+
+    async def _twap_collect(self, symbol: str, side: str, units: List[int], interval_s: int) -> List[Dict[str, Any]]:
+        if interval_s == 0:
+            # gather keeps the results in slice order, unlike the streaming burst
+            batches = _split_batches(units)
+            logger.info("TWAP burst placing {} market orders in {} concurrent batches", len(units), len(batches))
+            batch_results = await asyncio.gather(*(self._place_market_batch(symbol, side, batch) for batch in batches))
+            return [res for batch_res in batch_results for res in batch_res]
+        return [res async for res in self._twap_stream(symbol, side, units, interval_s)]
+
+    async def _twap_stream(self, symbol: str, side: str, units: List[int], interval_s: int) -> AsyncIterator[Dict[str, Any]]:
+        batches = _split_batches(units)
+
+        if interval_s == 0:
+            # No spacing requested: fire all batches at once so the network waits overlap;
+            # the order rate limiter paces them under Binance's per-second cap
+            logger.info("TWAP burst placing {} market orders in {} concurrent batches", len(units), len(batches))
+            tasks = [asyncio.ensure_future(self._place_market_batch(symbol, side, batch)) for batch in batches]
+            try:
+                for done in asyncio.as_completed(tasks):
+                    for res in await done:
+                        yield res
+            finally:
+                # Don't leave unawaited batches placing orders if the consumer stops early
+                for task in tasks:
+                    task.cancel()
+            return
+
+        start = time.monotonic()
+        for i, batch in enumerate(batches):
             logger.info(
-                "Market order request: symbol={}, side={}, qty={}",
-                from typing import Any, Dict
-                import traceback
-                import time
-
-                from binance.client import Client
-                from binance.exceptions import BinanceAPIException
-                from loguru import logger
-
-                from config import TESTNET_URL, LOG_FILE
-
-
-                logger.add(LOG_FILE, rotation="500 KB")
-
-
-                class BasicBot:
-                    """Simplified Binance Futures (USDT-M) bot wrapper.
-
-                    Notes:
-                    - Uses `python-binance` client; the repo should set `TESTNET_URL` in `config.py`.
-                    - This class provides methods for market, limit, and stop-limit orders.
-                    - All calls are logged to `LOG_FILE` configured in `config.py`.
-                    """
-
-                    def __init__(self, api_key: str, api_secret: str, testnet: bool = True):
-                        self.client = Client(api_key, api_secret)
-
-                        # Configure client's base URL for futures testnet if requested.
-                        # The library internals may differ across versions; setting both
-                        # known attributes helps ensure usage of the testnet endpoint.
-                        if testnet:
-                            try:
-                                # `FUTURES_URL` is used in some python-binance builds
-                                self.client.FUTURES_URL = TESTNET_URL
-                            except Exception:
-                                pass
-                            try:
-                                # Try setting API_URL as well (affects spot endpoints in some builds)
-                                self.client.API_URL = TESTNET_URL
-                            except Exception:
-                                pass
-
-                        logger.info("Initialized BasicBot (testnet={})", testnet)
-
-                    def _log_order_call(self, method: str, params: Dict[str, Any]):
-                        logger.info("Request -> {}: {}", method, params)
-
-                    def _log_response(self, method: str, resp: Any):
-                        logger.info("Response <- {}: {}", method, resp)
-
-                    def _safe_execute(self, fn, *args, **kwargs):
-                        """Execute a client function with logging and error handling."""
-                        method = fn.__name__ if hasattr(fn, "__name__") else str(fn)
-                        try:
-                            self._log_order_call(method, {**kwargs})
-                            start = time.time()
-                            resp = fn(*args, **kwargs)
-                            elapsed = time.time() - start
-                            self._log_response(method, {"elapsed_s": round(elapsed, 4), "result": resp})
-                            return resp
-                        except BinanceAPIException as e:
-                            logger.error("BinanceAPIException in {}: {}", method, e.message)
-                            return {"error": e.message}
-                        except Exception as e:
-                            logger.error("Unexpected error in {}: {}", method, str(e))
-                            logger.debug("Traceback:\n{}", traceback.format_exc())
-                            return {"error": str(e)}
-
-                    # ---------------------- MARKET ORDER ---------------------- #
-                    def place_market_order(self, symbol: str, side: str, quantity: float) -> Dict[str, Any]:
-                        """Place a market order on USDT-M futures."""
-                        params = dict(symbol=symbol, side=side, type="MARKET", quantity=quantity)
-                        return self._safe_execute(self.client.futures_create_order, **params)
-
-                    # ---------------------- LIMIT ORDER ----------------------- #
-                    def place_limit_order(self, symbol: str, side: str, quantity: float, price: float) -> Dict[str, Any]:
-                        """Place a limit order on USDT-M futures."""
-                        params = dict(symbol=symbol, side=side, type="LIMIT", timeInForce="GTC", price=price, quantity=quantity)
-                        return self._safe_execute(self.client.futures_create_order, **params)
-
-                    # ---------------------- STOP-LIMIT ORDER ------------------ #
-                    def place_stop_limit(self, symbol: str, side: str, quantity: float, price: float, stop_price: float) -> Dict[str, Any]:
-                        """Place a stop-limit (STOP) order on USDT-M futures."""
-                        params = dict(symbol=symbol, side=side, type="STOP", timeInForce="GTC", price=price, stopPrice=stop_price, quantity=quantity)
-                        return self._safe_execute(self.client.futures_create_order, **params)
+                "TWAP batch {}/{} placing {} market orders qty={}", i + 1, len(batches), len(batch), [_format_units(u) for u in batch]
+            )
+            for res in await self._place_market_batch(symbol, side, batch):
+                yield res
+            if i < len(batches) - 1:
+                # Sleep until the next slot rather than a fixed interval so order latency doesn't accumulate
+                remaining = start + (i + 1) * interval_s - time.monotonic()
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
@@ -4,40 +4,97 @@ Supports interactive mode and command-line arguments. Uses .env or environment v
 for API keys (or prompts for them securely). Provides market, limit, stop-limit and TWAP.
 """
 import argparse
+import asyncio
+import functools
 import os
+import shlex
 import sys
 import time
 import getpass
-from typing import Any
+from typing import Any, Callable, NamedTuple, Tuple
 
 from dotenv import load_dotenv
 
-from bot import BasicBot
+from bot import BasicBot, configure_logging
 
 
-def parse_args():
+class OrderHandler(NamedTuple):
+    """How to call the bot method behind one order type."""
+
+    fn: Callable[..., Any]
+    # Positional argument names after (symbol, side), in call order
+    args: Tuple[str, ...]
+    # (bot keyword, argument name) pairs passed as keyword arguments
+    kwargs: Tuple[Tuple[str, str], ...] = ()
+    # The call returns an async iterator of per-slice results instead of an awaitable
+    streams: bool = False
+
+
+# Order type -> handler
+HANDLERS = {
+    "market": OrderHandler(BasicBot.place_market_order, ("quantity",)),
+    "limit": OrderHandler(BasicBot.place_limit_order, ("quantity", "price")),
+    "stop_limit": OrderHandler(BasicBot.place_stop_limit, ("quantity", "price", "stop_price")),
+    "twap": OrderHandler(BasicBot.place_twap, ("quantity",), (("slices", "slices"), ("interval_s", "interval")), streams=True),
+}
+
+
+def _add_order_commands(p: argparse.ArgumentParser, required: bool = False, type_help: str = "Order type"):
+    # Arguments shared by every order type
+    order = argparse.ArgumentParser(add_help=False)
+    order.add_argument("--symbol", required=True, help="Trading pair symbol, e.g. BTCUSDT")
+    order.add_argument("--side", choices=["BUY", "SELL"], default="BUY", help="BUY or SELL (default: BUY)")
+    order.add_argument("--quantity", type=float, required=True, help="Quantity to trade")
+
+    sub = p.add_subparsers(dest="type", required=required, help=type_help)
+    sub.add_parser("market", parents=[order], help="Market order")
+    limit = sub.add_parser("limit", parents=[order], help="Limit order")
+    limit.add_argument("--price", type=float, required=True, help="Limit price")
+    stop_limit = sub.add_parser("stop_limit", parents=[order], help="Stop-limit order")
+    stop_limit.add_argument("--price", type=float, required=True, help="Limit price")
+    stop_limit.add_argument("--stop-price", type=float, required=True, help="Stop price")
+    twap = sub.add_parser("twap", parents=[order], help="TWAP split into market orders")
+    twap.add_argument("--slices", type=int, default=5, help="TWAP slices, sent in batches of up to 5 orders")
+    twap.add_argument("--interval", type=int, default=1, help="Seconds between TWAP batches of up to 5 orders")
+
+
+def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Binance Futures Testnet Trading CLI")
     p.add_argument("--api-key", help="API key (or set BINANCE_API_KEY or use .env)")
     p.add_argument("--api-secret", help="API secret (or set BINANCE_API_SECRET or use .env)")
-    p.add_argument("--symbol", help="Trading pair symbol, e.g. BTCUSDT")
-    p.add_argument("--side", choices=["BUY", "SELL"], help="BUY or SELL")
-    p.add_argument("--type", choices=["market", "limit", "stop_limit", "twap"], default="market", help="Order type")
-    p.add_argument("--quantity", type=float, help="Quantity to trade")
-    p.add_argument("--price", type=float, help="Price for limit/stop-limit")
-    p.add_argument("--stop-price", type=float, help="Stop price for stop-limit")
-    p.add_argument("--slices", type=int, default=5, help="TWAP slices")
-    p.add_argument("--interval", type=int, default=1, help="TWAP interval seconds")
     p.add_argument("--testnet", action="store_true", default=True, help="Use testnet URL (default: True)")
-    return p.parse_args()
+    p.add_argument("--daemon", action="store_true", help="Keep one bot alive and read order commands from stdin, one per line")
+    _add_order_commands(p, type_help="Order type (omit for interactive mode)")
+    return p
 
 
-def get_credentials(args) -> tuple[str, str]:
+def build_order_parser() -> argparse.ArgumentParser:
+    """Parser for one daemon line: an order subcommand and its options, nothing else."""
+    p = argparse.ArgumentParser(prog="order", description="Daemon order command")
+    _add_order_commands(p, required=True)
+    return p
+
+
+def parse_args():
+    return build_parser().parse_args()
+
+
+@functools.lru_cache(maxsize=1)
+def _load_env():
     # Load .env if present
     load_dotenv()
 
+
+def get_credentials(args) -> tuple[str, str]:
     api_key = args.api_key or os.getenv("BINANCE_API_KEY")
     api_secret = args.api_secret or os.getenv("BINANCE_API_SECRET")
 
+    if not api_key or not api_secret:
+        # Only parse .env when args/environment don't already provide the keys
+        _load_env()
+        api_key = api_key or os.getenv("BINANCE_API_KEY")
+        api_secret = api_secret or os.getenv("BINANCE_API_SECRET")
+
     if not api_key:
         api_key = input("Enter API Key: ")
     if not api_secret:
@@ -47,7 +104,7 @@ def get_credentials(args) -> tuple[str, str]:
     return api_key.strip(), api_secret.strip()
 
 
-def interactive_flow(bot: BasicBot):
+async def interactive_flow(bot: BasicBot):
     print("\n=== Binance Futures Trading Bot (Testnet) ===\n")
     symbol = input("Symbol (e.g., BTCUSDT): ").strip().upper()
     side = input("Side (BUY/SELL): ").strip().upper()
@@ -59,69 +116,88 @@ def interactive_flow(bot: BasicBot):
     qty = float(input("Quantity: "))
 
     if choice == "1":
-        print(bot.place_market_order(symbol, side, qty))
+        print(await bot.place_market_order(symbol, side, qty))
     elif choice == "2":
         price = float(input("Limit price: "))
-        print(bot.place_limit_order(symbol, side, qty, price))
+        print(await bot.place_limit_order(symbol, side, qty, price))
     elif choice == "3":
         price = float(input("Limit price: "))
         stop_price = float(input("Stop price: "))
-        print(bot.place_stop_limit(symbol, side, qty, price, stop_price))
+        print(await bot.place_stop_limit(symbol, side, qty, price, stop_price))
     elif choice == "4":
         slices = int(input("TWAP slices (e.g., 5): "))
-        interval = int(input("Interval seconds between slices (e.g., 1): "))
-        print(bot.place_twap(symbol, side, qty, slices=slices, interval_s=interval))
+        interval = int(input("Seconds between batches of up to 5 orders (e.g., 1): "))
+        async for res in bot.place_twap(symbol, side, qty, slices=slices, interval_s=interval):
+            print(res)
     else:
         print("Invalid choice")
 
 
-def cli_mode(args):
+async def cli_mode(args):
     api_key, api_secret = get_credentials(args)
-    bot = BasicBot(api_key, api_secret, testnet=args.testnet)
-
-    if not args.symbol:
-        return interactive_flow(bot)
+    bot = await BasicBot.create(api_key, api_secret, testnet=args.testnet)
+    try:
+        if args.daemon:
+            await daemon_loop(bot)
+        else:
+            await run_orders(bot, args)
+    finally:
+        await bot.close()
+
+
+async def daemon_loop(bot: BasicBot):
+    """Serve order commands from stdin on a single warm bot until EOF.
+
+    Each line takes the same order command as the CLI, e.g.
+    ``market --symbol BTCUSDT --side BUY --quantity 0.001``.
+    """
+    parser = build_order_parser()
+    print("Daemon ready; enter one order per line (Ctrl+D to exit)")
+    while True:
+        # Read off the event loop so the keep-alive ping keeps running while idle
+        line = await asyncio.to_thread(sys.stdin.readline)
+        if not line:
+            break
+        if not line.strip():
+            continue
+        try:
+            cmd = parser.parse_args(shlex.split(line))
+            await run_orders(bot, cmd)
+        except SystemExit:
+            # argparse has already reported the invalid command; keep serving
+            continue
+        except ValueError as e:
+            # e.g. unbalanced quotes or order arguments the bot rejects
+            print("Invalid command: %s" % e)
+            continue
+
+
+async def run_orders(bot: BasicBot, args):
+    if args.type is None:
+        return await interactive_flow(bot)
 
     symbol = args.symbol.upper()
-    side = (args.side or "BUY").upper()
-    if side not in {"BUY", "SELL"}:
-        print("Invalid side; choose BUY or SELL")
-        sys.exit(1)
-
-    if args.type == "market":
-        if not args.quantity:
-            print("--quantity is required for market order")
-            sys.exit(1)
-        res = bot.place_market_order(symbol, side, args.quantity)
-        print(res)
-
-    elif args.type == "limit":
-        if not args.quantity or not args.price:
-            print("--quantity and --price are required for limit order")
-            sys.exit(1)
-        res = bot.place_limit_order(symbol, side, args.quantity, args.price)
-        print(res)
-
-    elif args.type == "stop_limit":
-        if not args.quantity or not args.price or not args.stop_price:
-            print("--quantity, --price and --stop-price are required for stop-limit")
-            sys.exit(1)
-        res = bot.place_stop_limit(symbol, side, args.quantity, args.price, args.stop_price)
-        print(res)
-
-    elif args.type == "twap":
-        if not args.quantity:
-            print("--quantity is required for TWAP")
-            sys.exit(1)
-        print("Starting TWAP: slices=%s interval=%ss" % (args.slices, args.interval))
-        res = bot.place_twap(symbol, side, args.quantity, slices=args.slices, interval_s=args.interval)
-        print(res)
+    side = args.side
+
+    # Required arguments were enforced by the order type's subparser
+    handler = HANDLERS[args.type]
+    extra = {kw: getattr(args, name) for kw, name in handler.kwargs}
+    # Call first so argument validation fails before anything is announced
+    res = handler.fn(bot, symbol, side, *[getattr(args, name) for name in handler.args], **extra)
+    if extra:
+        print("Starting %s: %s" % (args.type, " ".join("%s=%s" % kv for kv in extra.items())))
+    if handler.streams:
+        async for slice_res in res:
+            print(slice_res)
+    else:
+        print(await res)
 
 
 def main():
     args = parse_args()
+    configure_logging()
     try:
-        cli_mode(args)
+        asyncio.run(cli_mode(args))
     except KeyboardInterrupt:
         print("\nInterrupted by user")
 
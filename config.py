@@ -1,3 +1,6 @@
 TESTNET_URL = "https://testnet.binancefuture.com"
 
 LOG_FILE = "bot.log"
+
+# Seconds between futures pings that keep the HTTPS connection warm
+KEEPALIVE_INTERVAL_S = 60